@@ -81,8 +81,8 @@ async def run():
             session_id = "user_session_1"
             
             while True:
-                # 사용자 입력 받기
-                user_input = input("질문을 입력하세요: ")
+                # 사용자 입력 받기 (별도 스레드에서 대기하여 이벤트 루프가 MCP stdio 통신을 계속 처리하도록 함)
+                user_input = await asyncio.to_thread(input, "질문을 입력하세요: ")
                 
                 # 종료 명령어 확인
                 if user_input.lower() in ['quit', 'exit', '종료']:
@@ -154,6 +154,18 @@ def get_table_info(table_name: str) -> str:
         return f"테이블 정보 조회 중 오류: {str(e)}"
 
 
+# 어시스턴트의 역할과 기능을 설명하는 시스템 메시지
+# 내용이 고정되어 있으므로 모듈 로드 시 한 번만 생성하여 모든 프롬프트 요청에서 재사용
+_SYSTEM_ASSISTANT = base.AssistantMessage(
+    "당신은 유용한 Chinook 데이터베이스 분석 어시스턴트입니다.\n"
+    "다음과 같은 방법으로 Chinook 음악 스토어 데이터베이스를 분석할 수 있습니다:\n"
+    "- 데이터를 검색하기 위한 SQL 쿼리 실행\n"
+    "- 테이블 스키마 정보 제공\n"
+    "- SQL 쿼리 문법 검증\n"
+    "- 사용 가능한 테이블 목록 제공\n"
+    "분석 결과를 명확하게 정리하여 반환해주세요."
+)
+
 @mcp.prompt()
 def default_prompt(message: str) -> list[base.Message]:
     """ 
@@ -161,16 +173,7 @@ def default_prompt(message: str) -> list[base.Message]:
     사용할 수 있는 시스템 메시지와 사용자 메시지를 반환합니다.
     """
     return [
-        # 어시스턴트의 역할과 기능을 설명하는 시스템 메시지
-        base.AssistantMessage(
-            "당신은 유용한 Chinook 데이터베이스 분석 어시스턴트입니다.\n"
-            "다음과 같은 방법으로 Chinook 음악 스토어 데이터베이스를 분석할 수 있습니다:\n"
-            "- 데이터를 검색하기 위한 SQL 쿼리 실행\n"
-            "- 테이블 스키마 정보 제공\n"
-            "- SQL 쿼리 문법 검증\n"
-            "- 사용 가능한 테이블 목록 제공\n"
-            "분석 결과를 명확하게 정리하여 반환해주세요."
-        ),
+        _SYSTEM_ASSISTANT,
         # 사용자의 실제 메시지
         base.UserMessage(message),
     ]
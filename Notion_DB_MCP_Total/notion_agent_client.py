@@ -4,19 +4,14 @@
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-from langchain_mcp_adapters.tools import load_mcp_tools
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import HumanMessage
-
 from dotenv import load_dotenv
+from contextlib import AsyncExitStack
+from functools import lru_cache
+import asyncio
 import os
 
 load_dotenv()
 
-model = init_chat_model("gpt-5-mini", model_provider="openai")
-
 # ─────────────────────────────────────────────────────────────
 # Notion 공식 MCP 서버 (@notionhq/notion-mcp-server) - npx 실행
 #   • 기본 transport: stdio (별도 옵션 불필요)
@@ -40,6 +35,156 @@ notion_server_params = StdioServerParameters(
     env={"NOTION_TOKEN": os.getenv("NOTION_API_KEY", "")}
 )
 
+# .env에서 기본 Notion 페이지 ID 읽기 (smithery Notion MCP에는 내장 기본값이 없으므로 프롬프트로 주입)
+default_page_id = os.getenv("NOTION_PAGE_ID", "")
+
+# Agent 시스템 프롬프트
+# 매 턴 동일한 문자열이어야 LLM 제공자의 프롬프트 캐시(시스템 프롬프트 + 도구 스키마 접두부)가 적중하므로
+# 기본 페이지 ID처럼 고정된 정보는 사용자 입력이 아닌 이곳에 한 번만 넣습니다.
+system_prompt = "당신은 Chinook 데이터베이스 분석과 Notion 자동화를 돕는 어시스턴트입니다."
+if default_page_id:
+    system_prompt += (
+        f"\n기본 작업 페이지 ID는 {default_page_id}입니다. "
+        f"페이지 생성/업데이트 시 이 ID를 기본 부모로 사용하세요."
+    )
+
+@lru_cache(maxsize=None)
+def get_model():
+    """LLM 모델을 처음 필요할 때 한 번만 생성하여 프로세스 전체에서 재사용합니다."""
+    from langchain.chat_models import init_chat_model
+    return init_chat_model("gpt-5-mini", model_provider="openai")
+
+@lru_cache(maxsize=None)
+def get_memory():
+    """
+    메모리 체크포인터 (대화 히스토리 저장)를 한 번만 생성합니다.
+    Agent를 다시 만들어도 같은 체크포인터를 쓰므로 대화 히스토리가 유지됩니다.
+    """
+    from langgraph.checkpoint.memory import MemorySaver
+    return MemorySaver()
+
+# MCPHost가 캐시하는 컴파일된 Agent의 최대 개수
+AGENT_CACHE_SIZE = 4
+
+class MCPHost:
+    """
+    여러 MCP 서버의 세션과 도구를 한 곳에서 관리하는 호스트입니다.
+    한 번 연결된 서버는 세션과 도구 목록을 그대로 재사용하므로,
+    setup_servers를 다시 호출해도 서버 프로세스를 새로 띄우지 않습니다.
+    """
+
+    def __init__(self):
+        # 서버 이름 -> ClientSession
+        self.sessions = {}
+        # 도구 이름 -> (서버 이름, LangChain 도구)
+        self.tool_registry = {}
+        # (프롬프트, 정렬된 도구 이름) -> 컴파일된 ReAct Agent
+        self.agents = {}
+        self._exit_stack = AsyncExitStack()
+
+    async def connect(self, servers):
+        """
+        아직 연결되지 않은 서버들만 실행하고, 초기화와 도구 로드를 동시에 진행합니다.
+        연결에 실패한 서버는 프로세스까지 정리하므로 다시 connect를 호출하면 새로 연결을 시도합니다.
+
+        Args:
+            servers: {서버 이름: StdioServerParameters} 딕셔너리
+        """
+        async def _initialize(name, session):
+            await session.initialize()
+            # 서버별로 핸드셰이크가 끝나는 즉시 출력하여 어떤 서버가 느린지 확인할 수 있게 함
+            print(f"{name} 서버 연결 완료")
+            return await load_mcp_tools(session)
+
+        # 서버마다 별도의 exit stack을 두어 실패한 서버만 따로 정리할 수 있게 함
+        # (pending: 아직 호스트 exit stack으로 옮겨지지도, 닫히지도 않은 서버)
+        pending = {}
+        new_sessions = {}
+        errors = []
+        try:
+            # anyio 취소 스코프는 연 태스크에서 닫아야 하므로 컨텍스트 진입은 순서대로 수행
+            for name, params in servers.items():
+                if name in self.sessions:
+                    print(f"{name} 서버는 이미 연결되어 있어 기존 세션을 재사용합니다")
+                    continue
+                stack = AsyncExitStack()
+                pending[name] = stack
+                read, write = await stack.enter_async_context(stdio_client(params))
+                new_sessions[name] = await stack.enter_async_context(ClientSession(read, write))
+
+            # 무거운 langchain 모듈은 서버 프로세스를 모두 띄운 뒤 import하여 서버 기동 시간과 겹치게 함
+            from langchain_mcp_adapters.tools import load_mcp_tools
+
+            # 초기화 핸드셰이크와 도구 로드는 서버들끼리 동시에 진행
+            results = await asyncio.gather(
+                *(_initialize(name, session) for name, session in new_sessions.items()),
+                return_exceptions=True,
+            )
+
+            for (name, session), result in zip(new_sessions.items(), results):
+                if not isinstance(result, BaseException):
+                    # 다른 서버의 도구와 이름이 겹치면 한쪽이 조용히 사라지지 않도록 연결 실패로 처리
+                    duplicated = sorted({tool.name for tool in result} & self.tool_registry.keys())
+                    if duplicated:
+                        result = ValueError(f"'{name}' 서버의 도구 이름이 이미 등록된 도구와 겹칩니다: {duplicated}")
+                if isinstance(result, BaseException):
+                    await pending.pop(name).aclose()
+                    errors.append(result)
+                    continue
+
+                await self._exit_stack.enter_async_context(pending.pop(name))
+                self.sessions[name] = session
+                for tool in result:
+                    self.tool_registry[tool.name] = (name, tool)
+        except BaseException:
+            # 도중에 취소/중단되면 호스트에 등록되지 않은 서버 프로세스를 모두 정리
+            for stack in reversed(list(pending.values())):
+                await stack.aclose()
+            raise
+
+        if errors:
+            raise errors[0]
+
+    def get_tools(self, name):
+        """특정 서버에서 로드한 도구 목록을 반환합니다."""
+        return [tool for server, tool in self.tool_registry.values() if server == name]
+
+    def get_all_tools(self):
+        """연결된 모든 서버의 도구를 하나의 리스트로 반환합니다."""
+        return [tool for _, tool in self.tool_registry.values()]
+
+    def get_agent(self, prompt):
+        """
+        연결된 모든 도구로 ReAct Agent를 생성하고, 같은 구성으로 다시 요청하면 캐시된 Agent를 반환합니다.
+        모델과 체크포인터는 프로세스 전체에서 하나만 사용하므로 캐시 키에 포함하지 않습니다.
+        캐시는 close()에서 세션과 함께 비워지므로 닫힌 세션에 묶인 Agent는 재사용되지 않습니다.
+
+        Args:
+            prompt: Agent 시스템 프롬프트
+        """
+        key = (prompt, tuple(sorted(self.tool_registry)))
+        agent = self.agents.get(key)
+        if agent is None:
+            from langgraph.prebuilt import create_react_agent
+
+            agent = create_react_agent(get_model(), self.get_all_tools(), prompt=prompt, checkpointer=get_memory())
+            # 가장 오래된 Agent부터 제거하여 캐시 크기 제한
+            if len(self.agents) >= AGENT_CACHE_SIZE:
+                self.agents.pop(next(iter(self.agents)))
+            self.agents[key] = agent
+        return agent
+
+    async def close(self):
+        """모든 세션과 서버 프로세스를 종료하고, 그 세션의 도구를 쓰는 Agent 캐시도 비웁니다."""
+        await self._exit_stack.aclose()
+        self._exit_stack = AsyncExitStack()
+        self.sessions.clear()
+        self.tool_registry.clear()
+        self.agents.clear()
+
+# 프로세스 전체에서 공유하는 MCP 호스트 (재연결 시 기존 세션 재사용)
+host = MCPHost()
+
 async def setup_servers():
     """    
     여러 MCP 서버의 도구들을 하나의 Agent에 통합하여
@@ -47,44 +192,33 @@ async def setup_servers():
     """
     print("MCP 서버들 연결 중...")
     
-    # MCP 서버와 stdio 통신 채널 열기
-    async with stdio_client(chinook_server_params) as (chinook_read, chinook_write):
-        # 클라이언트 세션 생성 및 초기화
-        async with ClientSession(chinook_read, chinook_write) as chinook_session:
-            # Chinook 서버 초기화
-            await chinook_session.initialize()
-            print("Chinook 데이터베이스 서버 연결 완료")
-            
-            # Notion 자동화 서버 연결
-            async with stdio_client(notion_server_params) as (notion_read, notion_write):
-                async with ClientSession(notion_read, notion_write) as notion_session:
-                    # Notion 서버 초기화
-                    await notion_session.initialize()
-                    print("Notion 자동화 서버 연결 완료")
-                    
-                    # Chinook DB 관련 도구들 (SQL 쿼리, 테이블 조회 등)
-                    chinook_tools = await load_mcp_tools(chinook_session)
-                    
-                    # Notion 관련 도구들 (페이지 생성, 테이블 생성 등)
-                    notion_tools = await load_mcp_tools(notion_session)
-                    
-                    # 모든 도구를 하나의 리스트로 통합
-                    all_tools = chinook_tools + notion_tools
-                    
-                    # 통합 결과 출력
-                    print(f"Chinook DB 도구: {len(chinook_tools)}개")
-                    print(f"Notion 도구: {len(notion_tools)}개")
-                    print(f"총 통합 도구: {len(all_tools)}개")
-                    
-                    # 메모리 체크포인터 (대화 히스토리 저장)
-                    memory = MemorySaver()
-                    
-                    # ReAct Agent 생성
-                    agent = create_react_agent(model, all_tools, checkpointer=memory)
-                    print("통합 Agent 생성 완료")
-                    
-                    # 대화형 챗봇 시작
-                    await start_chatbot(agent)
+    # Chinook DB 서버와 Notion 자동화 서버 연결 (이미 연결된 서버는 재사용)
+    await host.connect({
+        "chinook": chinook_server_params,
+        "notion": notion_server_params,
+    })
+    
+    # Chinook DB 관련 도구들 (SQL 쿼리, 테이블 조회 등)
+    chinook_tools = host.get_tools("chinook")
+    
+    # Notion 관련 도구들 (페이지 생성, 테이블 생성 등)
+    notion_tools = host.get_tools("notion")
+    
+    # 모든 도구를 하나의 리스트로 통합
+    all_tools = host.get_all_tools()
+    
+    # 통합 결과 출력
+    print(f"Chinook DB 도구: {len(chinook_tools)}개")
+    print(f"Notion 도구: {len(notion_tools)}개")
+    print(f"총 통합 도구: {len(all_tools)}개")
+    
+    # ReAct Agent 생성 (고정 시스템 프롬프트 사용, 같은 도구 구성이면 캐시된 Agent 재사용)
+    # LLM 모델과 langgraph 모듈은 서버 연결이 끝난 뒤 처음 필요할 때 생성/import
+    agent = host.get_agent(system_prompt)
+    print("통합 Agent 생성 완료")
+    
+    # 대화형 챗봇 시작
+    await start_chatbot(agent)
 
 async def start_chatbot(agent):
     """
@@ -93,14 +227,14 @@ async def start_chatbot(agent):
     Args:
         agent: 통합된 ReAct Agent
     """
+    from langchain_core.messages import HumanMessage
+
     print("\n" + "="*60)
     print("통합 MCP Agent 시작!")
     
-    # .env에서 기본 Notion 페이지 ID 읽기 (smithery Notion MCP에는 내장 기본값이 없으므로 프롬프트로 주입)
-    default_page_id = os.getenv("NOTION_PAGE_ID", "")
     if default_page_id:
         print(f"기본 작업 페이지 ID: {default_page_id}")
-        print("페이지 작업 시 별도 입력 없이 이 ID가 기본으로 사용되도록 챗봇 프롬프트에 주입합니다.")
+        print("페이지 작업 시 별도 입력 없이 이 ID가 기본으로 사용되도록 Agent 시스템 프롬프트에 주입했습니다.")
     else:
         print("⚠️  .env 파일에 NOTION_PAGE_ID가 설정되지 않았습니다. 페이지 작업 시 ID를 직접 입력하세요.")
     
@@ -112,7 +246,7 @@ async def start_chatbot(agent):
     
     while True:
 
-        user_input = input("질문을 입력하세요: ")
+        user_input = await asyncio.to_thread(input, "질문을 입력하세요: ")
         
         # 종료 명령어 확인
         if user_input.lower() in ['quit', 'exit', '종료']:
@@ -121,31 +255,29 @@ async def start_chatbot(agent):
         
         print("처리 중...\n")
         
-        # smithery Notion MCP는 페이지 ID 기본값이 없으므로, 환경변수의 기본 페이지 ID를
-        # 사용자 입력에 주석 형태로 주입하여 도구 호출 시 기준으로 활용하게 합니다.
-        if default_page_id:
-            enhanced_input = (
-                f"{user_input}\n\n[참고: 기본 작업 페이지 ID는 {default_page_id}입니다. "
-                f"페이지 생성/업데이트 시 이 ID를 기본 부모로 사용하세요.]"
-            )
-        else:
-            enhanced_input = user_input
-
         # 사용자 메시지를 LangChain 형식으로 변환
-        user_message = HumanMessage(content=enhanced_input)
+        user_message = HumanMessage(content=user_input)
         
         # 메모리 설정 (대화 히스토리 유지)
         config = {"configurable": {"thread_id": session_id}}
         
-        # 통합 Agent 실행
-        response = await agent.ainvoke(
-            {"messages": [user_message]}, 
-            config=config
-        )
-        
-        # Agent의 최종 응답 출력
+        # 통합 Agent 실행 (생성되는 토큰과 도구 호출을 스트리밍으로 바로 출력)
         print("응답:")
-        print(response["messages"][-1].content)
+        async for event in agent.astream_events(
+            {"messages": [user_message]},
+            config=config,
+            version="v2"
+        ):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                # LLM이 생성하는 토큰 조각 출력
+                chunk = event["data"]["chunk"]
+                if chunk.content:
+                    print(chunk.content, end="", flush=True)
+            elif kind == "on_tool_start":
+                # Agent가 호출하는 도구 이름 출력
+                print(f"\n[tool: {event['name']}] ", end="", flush=True)
+        print()
         print("\n" + "="*50 + "\n")
 
 async def run():
@@ -153,10 +285,12 @@ async def run():
     메인 실행 함수
     두 MCP 서버를 설정하고 통합 Agent를 시작합니다.
     """
-    await setup_servers()
+    try:
+        await setup_servers()
+    finally:
+        # 챗봇 종료 시 MCP 세션과 서버 프로세스 정리
+        await host.close()
 
 if __name__ == "__main__":
-    import asyncio
-    
     # 이벤트 루프 실행
     asyncio.run(run())
\ No newline at end of file
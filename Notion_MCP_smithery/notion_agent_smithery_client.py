@@ -3,21 +3,13 @@
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-from langchain_mcp_adapters.tools import load_mcp_tools
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import HumanMessage
-
 from dotenv import load_dotenv, find_dotenv
+import asyncio
 import os
 
 # 현재 경로에서 .env 파일 찾기, 없으면 상위 폴더에서 찾기
 load_dotenv(find_dotenv())
 
-model = init_chat_model("gpt-5-mini", model_provider="openai")
-# model = init_chat_model("gemini-2.5-flash", model_provider="google_genai")
-
 # ─────────────────────────────────────────────────────────────
 # Notion 공식 MCP 서버 (@notionhq/notion-mcp-server) - npx 실행
 #   • 기본 transport: stdio (별도 옵션 불필요)
@@ -33,10 +25,28 @@ notion_server_params = StdioServerParameters(
     env={"NOTION_TOKEN": os.getenv("NOTION_API_KEY", "")}
 )
 
+# .env에서 기본 페이지 ID 읽기
+default_page_id = os.getenv("NOTION_PAGE_ID", "")
+
+# Agent 시스템 프롬프트 (매 턴 동일해야 프롬프트 캐시가 적중하므로 기본 페이지 ID는 여기에만 넣음)
+system_prompt = "당신은 Notion 자동화 어시스턴트입니다."
+if default_page_id:
+    system_prompt += f"\n기본 작업 페이지 ID는 {default_page_id}입니다. 페이지 작업 시 이 ID를 사용하세요."
+
 async def setup_servers():
     print("Notion MCP 서버 연결 중...")
     async with stdio_client(notion_server_params) as (notion_read, notion_write):
         async with ClientSession(notion_read, notion_write) as notion_session:
+            # langchain/langgraph 모듈은 무거우므로 서버 프로세스를 띄운 뒤 import하여
+            # npx 서버가 기동하는 시간과 겹치게 함
+            from langchain_mcp_adapters.tools import load_mcp_tools
+            from langgraph.prebuilt import create_react_agent
+            from langgraph.checkpoint.memory import MemorySaver
+            from langchain.chat_models import init_chat_model
+
+            model = init_chat_model("gpt-5-mini", model_provider="openai")
+            # model = init_chat_model("gemini-2.5-flash", model_provider="google_genai")
+
             await notion_session.initialize()
             print("Notion 자동화 서버 연결 완료")
 
@@ -50,15 +60,14 @@ async def setup_servers():
             print()
 
             memory = MemorySaver()
-            agent = create_react_agent(model, notion_tools, checkpointer=memory)
+            agent = create_react_agent(model, notion_tools, prompt=system_prompt, checkpointer=memory)
             print("Notion Agent 생성 완료")
 
             await start_chatbot(agent)
 
 async def start_chatbot(agent):
-    # .env에서 기본 페이지 ID 읽기
-    default_page_id = os.getenv("NOTION_PAGE_ID", "")
-    
+    from langchain_core.messages import HumanMessage
+
     print("\n" + "="*60)
     print("Notion 자동화 Agent 시작!")
     if default_page_id:
@@ -73,24 +82,26 @@ async def start_chatbot(agent):
     session_id = "notion_session"
 
     while True:
-        user_input = input("질문을 입력하세요: ")
+        user_input = await asyncio.to_thread(input, "질문을 입력하세요: ")
         if user_input.lower() in ['quit', 'exit', '종료']:
             print("\nNotion Agent를 종료합니다.")
             break
 
-        # 기본 페이지 ID가 설정되어 있으면 사용자 입력에 추가 정보 제공
-        if default_page_id:
-            enhanced_input = f"{user_input}\n\n[참고: 기본 작업 페이지 ID는 {default_page_id}입니다. 페이지 작업 시 이 ID를 사용하세요.]"
-        else:
-            enhanced_input = user_input
-
         print("처리 중...\n")
-        user_message = HumanMessage(content=enhanced_input)
+        user_message = HumanMessage(content=user_input)
         config = {"configurable": {"thread_id": session_id}}
 
-        response = await agent.ainvoke({"messages": [user_message]}, config=config)
+        # 생성되는 토큰과 도구 호출을 스트리밍으로 바로 출력
         print("응답:")
-        print(response["messages"][-1].content)
+        async for event in agent.astream_events({"messages": [user_message]}, config=config, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                chunk = event["data"]["chunk"]
+                if chunk.content:
+                    print(chunk.content, end="", flush=True)
+            elif kind == "on_tool_start":
+                print(f"\n[tool: {event['name']}] ", end="", flush=True)
+        print()
         print("\n" + "="*50 + "\n")
 
 async def run():
@@ -102,5 +113,4 @@ async def run():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(run())